@@ -1,6 +1,51 @@
+import atexit
+import logging
+import threading
 from pymongo import MongoClient
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+_client = None
+_db = None
+_client_lock = threading.Lock()
+
+def get_mongo_client():
+    """
+    Returns the process-wide MongoClient, creating it on first use.
+
+    MongoClient is thread-safe and maintains its own connection pool, so all
+    requests share one client instead of paying the connection handshake each time.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                mongo_host = settings.MONGODB_SETTINGS.get("HOST", "mongodb://localhost:27017/")
+                # connect=False defers the first handshake to first use, which also keeps the
+                # client safe to create before a pre-forking server spawns its workers
+                _client = MongoClient(
+                    mongo_host,
+                    maxPoolSize=100,
+                    minPoolSize=5,
+                    socketTimeoutMS=30000,
+                    serverSelectionTimeoutMS=5000,
+                    connect=False,
+                )
+                atexit.register(_client.close)
+                logger.info("✅ MongoDB client created")
+    return _client
+
+def get_mongo_db():
+    """
+    Returns the configured database on the shared client. Database handles are cheap,
+    thread-safe and hold no connection of their own, so one is kept for the process.
+    """
+    global _db
+    if _db is None:
+        _db = get_mongo_client()[settings.MONGODB_SETTINGS.get("DATABASE_NAME", "default_db")]
+    return _db
+
 class MongoDBConnection:
     def __init__(self):
         self.client = None
@@ -9,14 +54,12 @@ class MongoDBConnection:
     def connect(self):
         if not self.client:
             try:
-                mongo_host = settings.MONGODB_SETTINGS.get("HOST", "mongodb://localhost:27017/")
                 database_name = settings.MONGODB_SETTINGS.get("DATABASE_NAME", "default_db")
 
-                self.client = MongoClient(mongo_host)
+                self.client = get_mongo_client()
                 self.db = self.client[database_name]
-                print("✅ Connected to MongoDB")
             except Exception as e:
-                print(f"Connection error: {e}")
+                logger.error("Connection error: %s", e)
                 raise e
 
     def execute_query(self, collection_name, query):
@@ -27,12 +70,14 @@ class MongoDBConnection:
             collection = self.db[collection_name]
             return collection.find(query)
         except Exception as e:
-            print(f"Query execution error: {e}")
+            logger.error("Query execution error: %s", e)
             raise e
 
     def close(self):
+        """
+        Releases this connection's handles. The shared client stays open for other
+        requests and is closed at process exit.
+        """
         if self.client:
-            self.client.close()
             self.client = None
             self.db = None
-            print("🔒 MongoDB connection closed")
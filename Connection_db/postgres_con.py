@@ -1,61 +1,43 @@
-import psycopg2
-from psycopg2 import OperationalError
-from django.shortcuts import render
-from django.contrib.auth.decorators import login_required
+import logging
 from django.db import connections
 
+logger = logging.getLogger(__name__)
+
 
 
 class PostgresDBConnection:
-    def __init__(self):
-        """
-        Initializes the database connection using Django's default database settings.
+    def __init__(self, alias='default'):
         """
-        self.connection = connections['default']
-        self.cursor = None
+        Uses one of Django's configured databases (the default one unless told otherwise).
 
-    def connect(self):
+        Django keeps a separate connection per thread and reuses it across requests
+        according to CONN_MAX_AGE, so every query opens its own short-lived cursor on
+        the calling thread's connection instead of sharing one cursor between threads.
         """
-        Establishes a connection and cursor if not already active.
-        """
-        if not self.is_cursor_active():
-            try:
-                self.cursor = self.connection.cursor()
-                print("✅ Connected to PostgreSQL via Django settings")
-            except OperationalError as e:
-                print(f"❌ Connection error: {e}")
-
-    def is_cursor_active(self):
+        self.alias = alias
+
+    @property
+    def connection(self):
         """
-        Checks if the cursor is active and not closed.
+        Returns the calling thread's Django connection for this database.
         """
-        return self.cursor and not self.cursor.closed
+        return connections[self.alias]
 
     def execute_query(self, query, params=None):
         """
-        Executes a given SQL query using the active cursor.
+        Executes a given SQL query on a fresh cursor.
 
         Args:
             query (str): SQL query to be executed.
             params (list or tuple, optional): Parameters to pass with the query.
 
         Returns:
-            cursor: Cursor after executing the query.
+            list: Fetched rows, or an empty list for statements that return no rows.
         """
-        if not self.is_cursor_active():
-            self.connect()
-
         try:
-            self.cursor.execute(query, params)
-            return self.cursor
+            with self.connection.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall() if cursor.description else []
         except Exception as e:
-            print(f"❌ Query execution error: {e}")
+            logger.error("❌ Query execution error: %s", e)
             raise e
-
-    def close(self):
-        """
-        Closes the cursor if it is active.
-        """
-        if self.is_cursor_active():
-            self.cursor.close()
-            print("🔒 Cursor closed")
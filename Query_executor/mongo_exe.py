@@ -1,11 +1,46 @@
-import re
 import json
+import re
 import logging
-from pymongo import MongoClient
+from datetime import datetime
+from functools import lru_cache
+import orjson
+from django.conf import settings
 from bson import ObjectId
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
 
 logger = logging.getLogger(__name__)
 
+# ✅ One alternation covers every token fix_json_keys rewrites; everything else is copied by re.sub in C
+_JSON_TOKEN_RE = re.compile(r"""
+    (?P<size>["']?\$size["']?\s*:\s*\{\s*["']?\$gt["']?\s*:\s*(?P<size_gt>\d+)\s*\})   # misused $size: {$gt: n}
+  | (?P<dq>"(?:[^"\\]|\\.)*")                                 # double-quoted string, kept as is
+  | '(?P<sq>(?:[^'\\]|\\.)*)'                                 # single-quoted string, re-delimited
+  | (?P<num>[0-9][0-9.eE+-]*)                                # number, kept whole so 1e5 stays a number
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$.]*)(?P<call>\s*\()?     # bare identifier, or a call like ObjectId(
+""", re.VERBOSE | re.DOTALL)
+_JSON_KEYWORDS = frozenset(("true", "false", "null", "NaN", "Infinity"))
+# Python/JS spellings the generator sometimes emits, mapped to their JSON literals
+_LITERAL_ALIASES = {"True": "true", "False": "false", "None": "null", "undefined": "null"}
+# NaN and Infinity are left bare like the baseline's json.loads accepted them; orjson rejects them
+_NON_FINITE_RE = re.compile(r"\b(?:NaN|Infinity)\b")
+
+class ObjectIdDecoder(TypeDecoder):
+    """Decodes BSON ObjectId values straight to their hex string."""
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+class DatetimeDecoder(TypeDecoder):
+    """Decodes BSON datetime values straight to ISO format strings."""
+    bson_type = datetime
+
+    def transform_bson(self, value):
+        return value.isoformat()
+
+# ✅ Results come out of the BSON decoder already JSON-ready, with no conversion pass afterwards
+_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([ObjectIdDecoder(), DatetimeDecoder()]))
+
 class MongoQueryExecutor:
     def __init__(self, db_connection):
         """
@@ -13,109 +48,177 @@ class MongoQueryExecutor:
         """
         self.db_connection = db_connection  # ✅ Stores the database connection
 
-    def execute_query(self, query, output_file="output.json"):
+    def execute_query(self, query, output_file="output.json", batch_size=1000, pretty=False):
         """
         Executes a MongoDB query and returns results in JSON format.
 
         :param query: MongoDB query as a string (e.g., "db.collection.find({...})" or "db.collection.aggregate([...])").
         :param output_file: File path to save JSON results.
+        :param batch_size: Number of documents fetched from the server per cursor batch.
+        :param pretty: Indent the JSON written to output_file; compact output is smaller and faster to write.
         :return: JSON object with query results or an error message.
         """
         try:
-            logger.debug(f"🔍 Raw MongoDB Query Received: {query}")
-
-            #query_content = fix_json_keys(query_content)
-            match = re.match(r"db\.(\w+)\.(find|aggregate)\((.*)\)", query.strip())
-            if not match:
-                raise ValueError("Invalid query format. Expected 'db.collection.find({...})' or 'db.collection.aggregate([...])'.")
-
-            collection_name = match.group(1)
-            query_type = match.group(2)
-            query_args = match.group(3)
-            if ',' in query_args and match.group(2) == "find":
-                query_content, projection_content = map(str.strip, query_args.split(',', 1))
-            else:
-                query_content = query_args.strip()
-                projection_content = None
-
-            logger.debug(f"✅ Extracted Collection: {collection_name}, Query Type: {query_type}")
-            logger.debug(f"🔍 Extracted Query Content: {query_content}")
-            logger.debug(f"🔍 Extracted Projection: {projection_content}")
+            logger.debug("🔍 Raw MongoDB Query Received: %s", query)
 
-            # ✅ Auto-fix JSON format dynamically
-            query_content = fix_json_keys(query_content)
-            if projection_content:
-                projection_content = fix_json_keys(projection_content)
+            collection_name, query_type, query_dict, projection_dict = parse_query(query)
 
-            
-            logger.debug(f"🧪 Raw query_content before JSON parsing: {query_content}")
-            query_dict = json.loads(query_content)
-            projection_dict = json.loads(projection_content) if projection_content else None
+            collection = self.db_connection.get_collection(collection_name, codec_options=_CODEC_OPTIONS)
 
-            logger.debug(f"✅ Parsed Query: {query_dict}")
-            logger.debug(f"✅ Parsed Projection: {projection_dict}")
+            cursor = _QUERY_RUNNERS[query_type](collection, query_dict, projection_dict, batch_size)
 
-            collection = self.db_connection[collection_name]
-
-            if query_type == "find":
-                result = list(collection.find(query_dict, projection_dict if projection_dict else None))
-            elif query_type == "aggregate":
-                result = list(collection.aggregate(query_dict))
-            else:
-                raise ValueError(f"Unsupported query type: {query_type}")
-
-            result = convert_objectid(result)
-
-            with open(output_file, "w", encoding="utf-8") as json_file:
-                json.dump(result, json_file, indent=4)
+            # ✅ Stream documents to disk batch by batch instead of materializing the cursor first
+            option = orjson.OPT_INDENT_2 if pretty else None
+            separator = b",\n" if pretty else b","
+            result = []
+            with open(output_file, "wb", buffering=1 << 20) as json_file:
+                json_file.write(b"[")
+                for index, doc in enumerate(cursor):
+                    if index:
+                        json_file.write(separator)
+                    json_file.write(orjson.dumps(doc, option=option))
+                    result.append(doc)
+                json_file.write(b"]")
 
             return {"status": "success", "data": result, "file": output_file}
 
         except Exception as e:
-            logger.error(f"🚨 Query execution failed: {str(e)}", exc_info=True)
+            # ✅ Malformed generated queries fail often; only pay for a traceback when debugging
+            logger.error("🚨 Query execution failed: %s", e, exc_info=settings.DEBUG)
             return {"error": f"Query execution failed: {str(e)}"}
 
-from datetime import datetime
-from bson import ObjectId
+def _run_find(collection, query_dict, projection_dict, batch_size):
+    return collection.find(query_dict, projection_dict if projection_dict else None).batch_size(batch_size)
+
+def _run_aggregate(collection, query_dict, projection_dict, batch_size):
+    return collection.aggregate(query_dict, batchSize=batch_size)
+
+# ✅ Supported query methods, dispatched by name; split_query_call rejects anything else
+_QUERY_RUNNERS = {"find": _run_find, "aggregate": _run_aggregate}
 
-def convert_objectid(doc):
+@lru_cache(maxsize=1024)
+def parse_query(query):
     """
-    Recursively converts ObjectId and datetime fields to strings in a MongoDB result.
+    Parses a MongoDB query string into (collection_name, query_type, query_dict, projection_dict).
+
+    Results are cached by query string, so re-running a query skips the regex, JSON fix-up and
+    JSON parsing. The returned dicts are shared between calls and must not be mutated;
+    pymongo only reads filters, projections and pipelines.
     """
-    if isinstance(doc, list):
-        return [convert_objectid(item) for item in doc]
-    elif isinstance(doc, dict):
-        return {key: convert_objectid(value) for key, value in doc.items()}
-    elif isinstance(doc, ObjectId):
-        return str(doc)  # ✅ Convert ObjectId to string
-    elif isinstance(doc, datetime):
-        return doc.isoformat()  # ✅ Convert datetime to ISO format string
+    collection_name, query_type, query_args = split_query_call(query.strip())
+    if ',' in query_args and query_type == "find":
+        query_content, *rest = split_arguments(query_args)
+        projection_content = rest[0] if rest else None
     else:
-        return doc
+        query_content = query_args.strip()
+        projection_content = None
 
-def fix_json_keys(json_string):
-    """
-    Fixes MongoDB queries before JSON parsing:
-    - Converts single quotes to double quotes.
-    - Ensures MongoDB operators (e.g., $group, $match, $lookup) are properly quoted.
-    - Ensures field names are quoted.
-    - Fixes array elements inside `$concat` where strings need double quotes.
-    """
-    # ✅ Convert single quotes to double quotes
-    json_string = json_string.replace("'", '"')
+    debug_on = logger.isEnabledFor(logging.DEBUG)
+    if debug_on:
+        logger.debug("✅ Extracted Collection: %s, Query Type: %s", collection_name, query_type)
+        logger.debug("🔍 Extracted Query Content: %s", query_content)
+        logger.debug("🔍 Extracted Projection: %s", projection_content)
 
-    # ✅ Fix field names (e.g., {field: 1} → {"field": 1})
-    json_string = re.sub(r'([{,])\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_string)
+    query_dict = parse_json_argument(query_content)
+    projection_dict = parse_json_argument(projection_content) if projection_content else None
 
-    # ✅ Ensure MongoDB operators ($group, $match, $lookup, etc.) remain quoted
-    json_string = re.sub(r'([{,])\s*(\$[a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_string)
+    if debug_on:
+        logger.debug("✅ Parsed Query: %s", query_dict)
+        logger.debug("✅ Parsed Projection: %s", projection_dict)
 
-    # ✅ Fix array elements inside `$concat` where strings need double quotes
-    json_string = re.sub(r'(\[\s*)("?\$[a-zA-Z_][a-zA-Z0-9_.]*"?)\s*,\s*("?\s*[^"\$][^,]*\s*"?)\s*,\s*("?\$[a-zA-Z_][a-zA-Z0-9_.]*"?)\s*\]',
-                         r'\1"\2", "\3", "\4"]', json_string)
+    return collection_name, query_type, query_dict, projection_dict
 
-    # ✅ Fix incorrect `$size` usage in `$match`
-    json_string = re.sub(r'"(\$size)":\s*\{"(\$gt)":\s*(\d+)\}',
-                         r'"$expr": { "\2": [ { "\1": "\3" }, 1 ] }', json_string)
+def split_query_call(query):
+    """
+    Splits `db.<collection>.<method>(<args>)` into (collection, method, args) with plain
+    string scanning rather than a backtracking regex over the whole argument body.
+    """
+    dot = query.find(".", 3)
+    open_paren = query.find("(", dot + 1)
+    close_paren = query.rfind(")")
+    if query.startswith("db.") and 3 < dot < open_paren < close_paren:
+        collection_name = query[3:dot]
+        method = query[dot + 1:open_paren]
+        if method in _QUERY_RUNNERS and all(char.isalnum() or char == "_" for char in collection_name):
+            return collection_name, method, query[open_paren + 1:close_paren]
+
+    raise ValueError("Invalid query format. Expected 'db.collection.find({...})' or 'db.collection.aggregate([...])'.")
+
+def split_arguments(args):
+    """
+    Splits a call's argument body on top-level commas in one scan, tracking bracket depth
+    and quoted strings so commas inside a filter like `{a: 1, b: 'x, y'}` stay put.
+    """
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    index = 0
+    while index < len(args):
+        char = args[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char == '"' or char == "'":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(args[start:index].strip())
+            start = index + 1
+        index += 1
+
+    parts.append(args[start:].strip())
+    return parts
+
+def parse_json_argument(content):
+    """
+    Fixes and parses a single query argument. Empty arguments, as in `find()`, `find({})`
+    or `aggregate([])`, skip the JSON fix-up and the parser entirely.
+    """
+    if content == "" or content == "{}":
+        return {}
+    if content == "[]":
+        return []
+
+    # ✅ Auto-fix JSON format dynamically
+    content = fix_json_keys(content)
+    logger.debug("🧪 Raw content before JSON parsing: %s", content)
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # Only the rare query with NaN/±Infinity takes the slower stdlib parser, which reads them as floats
+        if _NON_FINITE_RE.search(content):
+            return json.loads(content)
+        raise
+
+def _fix_json_token(match):
+    kind = match.lastgroup
+    if kind == "sq":
+        body = match.group("sq").replace('\\"', '"').replace("\\'", "'").replace('"', '\\"')
+        return f'"{body}"'
+    if kind == "size":
+        return f'"$expr": {{ "$gt": [ {{ "$size": "{match.group("size_gt")}" }}, 1 ] }}'
+    if kind == "ident":
+        word = match.group("ident")
+        if word in _JSON_KEYWORDS:
+            return word
+        return _LITERAL_ALIASES.get(word) or f'"{word}"'
+    # ✅ Double-quoted strings, numbers and constructor calls pass through untouched
+    return match.group()
 
-    return json_string
\ No newline at end of file
+def fix_json_keys(json_string):
+    """
+    Fixes MongoDB queries before JSON parsing in a single regex pass over the string:
+    - Converts single-quoted strings to double-quoted ones.
+    - Ensures field names and MongoDB operators (e.g., $group, $match, $lookup) are quoted.
+    - Quotes bare `$field` references, e.g. the array elements inside `$concat`.
+    - Fixes incorrect `$size` usage in `$match`.
+    - Turns Python/JS literals (`True`, `False`, `None`, `undefined`) into JSON ones.
+    String literals are copied untouched, so quotes inside them (e.g. "O'Brien") survive.
+    """
+    return _JSON_TOKEN_RE.sub(_fix_json_token, json_string)
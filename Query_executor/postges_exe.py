@@ -1,17 +1,27 @@
+import re
 import psycopg2
-import json
-from psycopg2.extras import DictCursor
+import orjson
+from psycopg2.extras import DictCursor, RealDictCursor
 from datetime import date, datetime
 from decimal import Decimal
+from uuid import uuid4
 
+_SELECT_RE = re.compile(r"\s*select", re.IGNORECASE)
 
-def serialize_date(obj):
-    """Convert non-serializable objects to a JSON-friendly format."""
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError("Type not serializable")
+
+def is_select_query(query):
+    """Check whether a SQL statement is a SELECT by looking only at its first keyword."""
+    return _SELECT_RE.match(query) is not None
+
+def normalize_value(value):
+    """Convert a column value to the JSON-friendly form returned to callers."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    elif isinstance(value, Decimal):
+        return float(value)
+    elif isinstance(value, list):
+        return [normalize_value(item) for item in value]
+    return value
 
 class QueryExecutor:
     def __init__(self, db_connection):
@@ -19,24 +29,55 @@ class QueryExecutor:
         if self.db_connection is None or not hasattr(self.db_connection, 'connection'):
             raise ValueError("Invalid database connection provided.")
 
-    def execute_query(self, query, params=None, output_file="output.json"):
+    def iter_rows(self, query, params=None, itersize=2000, server_side=True):
+        """
+        Yield the rows of a SELECT one at a time, as dicts with JSON-friendly values.
+
+        With server_side, a named cursor streams rows in itersize batches so the caller can
+        consume them lazily; WITH HOLD lets it be declared outside a transaction block under
+        autocommit. That costs a DECLARE plus a FETCH per batch, so callers that keep every
+        row anyway pass server_side=False and get the whole result in one round-trip.
+        Databases configured with DISABLE_SERVER_SIDE_CURSORS (e.g. behind PgBouncer in
+        transaction mode) always get a regular client-side cursor.
+        """
+        settings_dict = getattr(self.db_connection, 'settings_dict', {})
+        server_side = server_side and not settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+        # Each call gets its own cursor name so concurrent streams on one connection don't collide
+        name = f"query_executor_{uuid4().hex}" if server_side else None
+        with self.db_connection.connection.cursor(name=name, cursor_factory=RealDictCursor, withhold=server_side) as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                for row in rows:
+                    # Convert to JSON format, normalizing Decimal and date values once per cell
+                    yield {column: normalize_value(value) for column, value in row.items()}
+
+    def execute_query(self, query, params=None, output_file="output.json", itersize=2000, pretty=False):
         if not query:
             raise ValueError("Empty query provided")
         try:
-            cursor = self.db_connection.connection.cursor(cursor_factory=DictCursor)
-            cursor.execute(query, params)
-
             # Fetch results if it's a SELECT query
-            if query.strip().lower().startswith("select"):
-                columns = [desc[0] for desc in cursor.description]  # Extract column names
-                rows = cursor.fetchall()
-                result = [dict(zip(columns, row)) for row in rows]  # Convert to JSON format
-                
-                # Serialize result and save to JSON file
-                with open(output_file, "w", encoding="utf-8") as json_file:
-                    json.dump(result, json_file, indent=4, default=serialize_date)
+            if is_select_query(query):
+                # Compact JSON unless pretty output is asked for; indenting inflates the file
+                option = orjson.OPT_INDENT_2 if pretty else None
+                separator = b",\n" if pretty else b","
+                result = []
+                with open(output_file, "wb", buffering=1 << 20) as json_file:
+                    json_file.write(b"[")
+                    # Every row is returned, so a client cursor fetches them all in one round-trip
+                    for index, row in enumerate(self.iter_rows(query, params, itersize, server_side=False)):
+                        if index:
+                            json_file.write(separator)
+                        json_file.write(orjson.dumps(row, option=option))
+                        result.append(row)
+                    json_file.write(b"]")
+
+                return {"status": "success", "data": result, "file": output_file}   # Return JSON response
 
-                return json.loads(json.dumps({"status": "success", "data": result, "file": output_file}, default=serialize_date))   # Return JSON response
+            cursor = self.db_connection.connection.cursor(cursor_factory=DictCursor)
+            cursor.execute(query, params)
 
             # Commit changes for INSERT/UPDATE/DELETE queries
             self.db_connection.connection.commit()
@@ -46,40 +87,3 @@ class QueryExecutor:
             if self.db_connection and hasattr(self.db_connection, 'connection'):
                 self.db_connection.connection.rollback()
             raise Exception(f"Query execution failed: {str(e)}")
-
-# import psycopg2
-# import json
-# from psycopg2.extras import DictCursor
-
-# class QueryExecutor:
-#     def __init__(self, db_connection):
-#         self.db_connection = db_connection
-#         if self.db_connection is None or not hasattr(self.db_connection, 'connection'):
-#             raise ValueError("Invalid database connection provided.")
-
-#     def execute_query(self, query, params=None, output_file="output.json"):
-#         if not query:
-#             raise ValueError("Empty query provided")
-#         try:
-#             cursor = self.db_connection.connection.cursor(cursor_factory=DictCursor)
-#             cursor.execute(query, params)
-
-#             # Fetch results if it's a SELECT query
-#             if query.strip().lower().startswith("select"):
-#                 columns = [desc[0] for desc in cursor.description]  # Extract column names
-#                 rows = cursor.fetchall()
-#                 result = [dict(zip(columns, row)) for row in rows]  # Convert to JSON format
-                
-#                 with open(output_file, "w", encoding="utf-8") as json_file:
-#                     json.dump(result, json_file, indent=4)
-
-#                 return {"status": "success", "data": result, "file": output_file}  # Return JSON response
-
-#             # Commit changes for INSERT/UPDATE/DELETE queries
-#             self.db_connection.connection.commit()
-#             return {"status": "success", "rows_affected": cursor.rowcount}
-
-#         except Exception as e:
-#             if self.db_connection and hasattr(self.db_connection, 'connection'):
-#                 self.db_connection.connection.rollback()
-#             raise Exception(f"Query execution failed: {str(e)}")
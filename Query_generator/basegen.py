@@ -10,6 +10,9 @@ logging.basicConfig(level=logging.WARNING)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project1.settings")
 
+_DISALLOWED_CHARS_RE = re.compile(r"[^\w\s,.]")
+_CODE_FENCE_RE = re.compile(r'```(json)?\n?|\n```')
+
 class QueryGenerator():
     def __init__(self, connection):
         if not hasattr(connection, "cursor"): 
@@ -27,14 +30,14 @@ class QueryGenerator():
     def clean_user_query(self, user_input):  
         if not isinstance(user_input, str) or not user_input.strip():
             return None  
-        user_input = re.sub(r"[^\w\s,.]", "", user_input)
+        user_input = _DISALLOWED_CHARS_RE.sub("", user_input)
         cleaned_input = " ".join(user_input.split())
         return cleaned_input
 
     def clean_response(self, response):
         if not response:
             return {}
-        cleaned = re.sub(r'```(json)?\n?|\n```', '', str(response))
+        cleaned = _CODE_FENCE_RE.sub('', str(response))
         try:
             return json.loads(cleaned)
         except Exception as e:
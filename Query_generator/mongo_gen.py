@@ -1,13 +1,15 @@
 from .basegen import QueryGenerator
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from pymongo import MongoClient
+from Connection_db.mongo_con import get_mongo_client
 from django.db import connection, connections
 import logging
 logger = logging.getLogger(__name__)
 import re
 from django.conf import settings
 
+_BACKSLASH_RUN_RE = re.compile(r'\\+')
+
 class MongoQueryGenerator(QueryGenerator):
 
     def __init__(self, client, database_name):
@@ -31,7 +33,7 @@ class MongoQueryGenerator(QueryGenerator):
                     raw_prompt = row[0]
                     cleaned_prompt = raw_prompt.encode('utf-8').decode('utf-8')
                     cleaned_prompt = cleaned_prompt.replace("\\n", "\n").replace("\\\"", "\"")
-                    cleaned_prompt = re.sub(r'\\+', '', cleaned_prompt)
+                    cleaned_prompt = _BACKSLASH_RUN_RE.sub('', cleaned_prompt)
                     return cleaned_prompt
                 else:
                     return "Default prompt"
@@ -69,10 +71,8 @@ class MongoQueryGenerator(QueryGenerator):
 
     @login_required
     def nosql_generator(request):
-        mongo_host = settings.MONGODB_SETTINGS["HOST"]
         database_name = settings.MONGODB_SETTINGS["DATABASE_NAME"]
-        mongo_client = MongoClient(mongo_host)
-        generator = MongoQueryGenerator(mongo_client, database_name)
+        generator = MongoQueryGenerator(get_mongo_client(), database_name)
         
         user_input = None
         query = None
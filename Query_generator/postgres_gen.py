@@ -5,6 +5,8 @@ from django.db import connections
 import logging
 import re
 
+_BACKSLASH_RUN_RE = re.compile(r'\\+')
+
 class PostgresQueryGenerator(QueryGenerator):
     def __init__(self, connection):
         super().__init__(connection)
@@ -23,7 +25,7 @@ class PostgresQueryGenerator(QueryGenerator):
                     raw_prompt = row[0]
                     cleaned_prompt = raw_prompt.encode('utf-8').decode('utf-8')
                     cleaned_prompt = cleaned_prompt.replace("\\n", "\n").replace("\\\"", "\"")
-                    cleaned_prompt = re.sub(r'\\+', '', cleaned_prompt)
+                    cleaned_prompt = _BACKSLASH_RUN_RE.sub('', cleaned_prompt)
 
                     return cleaned_prompt
             
@@ -0,0 +1,135 @@
+import atexit
+import io
+import logging
+import queue
+import threading
+import time
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+COPY_THRESHOLD = 100  # larger batches are loaded with COPY instead of a multi-row INSERT
+FLUSH_INTERVAL = 0.05  # seconds to wait for more rows after the first one arrives
+MAX_QUEUED_ROWS = 10000  # beyond this, enqueueing blocks until the writer catches up
+
+_INSERT_SQL = """
+    INSERT INTO chat_history (chat_id, user_name, user_query, generated_query, database_type, created_at)
+    VALUES %s
+"""
+_COPY_SQL = """
+    COPY chat_history (chat_id, user_name, user_query, generated_query, database_type, created_at)
+    FROM STDIN WITH (FORMAT csv, NULL '\\N')
+"""
+
+_rows = queue.Queue(maxsize=MAX_QUEUED_ROWS)
+_worker = None
+_worker_lock = threading.Lock()
+
+def enqueue_chat_history(chat_id, user_name, user_query, generated_query, database_type):
+    """
+    Queues one chat_history row and returns immediately.
+
+    A background thread inserts queued rows in batches of up to BATCH_SIZE, one multi-row
+    INSERT (or COPY, for large bursts) and one commit per batch instead of a round-trip
+    and commit per request.
+    created_at is taken here so rows keep the time the query was generated. If the
+    database falls behind and MAX_QUEUED_ROWS are waiting, the row is written inline by
+    the calling request instead, so memory stays bounded without blocking or dropping rows.
+    """
+    _ensure_worker()
+    row = (chat_id, user_name, user_query, generated_query, database_type, timezone.now())
+    try:
+        _rows.put_nowait(row)
+    except queue.Full:
+        logger.warning("Chat history queue is full; writing the row inline")
+        _save_rows([row])
+
+def flush():
+    """Blocks until every queued row has been written (or failed); registered with atexit."""
+    if _worker is not None and _worker.is_alive():
+        _rows.join()
+
+def _ensure_worker():
+    """Starts the writer thread on first use, and again if it has died."""
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                if _worker is None:
+                    atexit.register(flush)
+                else:
+                    logger.error("Chat history writer thread died; restarting it")
+                _worker = threading.Thread(target=_run, name="chat-history-writer", daemon=True)
+                _worker.start()
+
+def _next_batch():
+    """Waits for a row, then gathers more until the batch is full or FLUSH_INTERVAL passes."""
+    batch = [_rows.get()]
+    deadline = time.monotonic() + FLUSH_INTERVAL
+    while len(batch) < BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_rows.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _write_batch(batch):
+    # The writer thread never sees request_started/finished, so it recycles its own connection
+    close_old_connections()
+    try:
+        _save_rows(batch)
+    finally:
+        close_old_connections()
+
+def _save_rows(rows):
+    """Inserts rows, retrying one by one if the batch fails so a bad row only loses itself."""
+    try:
+        _insert_rows(rows)
+        return
+    except Exception:
+        logger.exception("Failed to save %d chat history rows", len(rows))
+        if len(rows) == 1:
+            return
+    for row in rows:
+        try:
+            _insert_rows([row])
+        except Exception:
+            logger.exception("Failed to save chat history row %s", row[0])
+
+def _insert_rows(rows):
+    with transaction.atomic():
+        with connections['default'].cursor() as cursor:
+            if len(rows) > COPY_THRESHOLD:
+                cursor.cursor.copy_expert(_COPY_SQL, _to_csv(rows))
+            else:
+                execute_values(cursor.cursor, _INSERT_SQL, rows)
+
+def _csv_field(value):
+    # Every value is quoted, so only the bare \N marker loads as NULL: empty strings and
+    # text that happens to read "\N" stay strings
+    if value is None:
+        return r"\N"
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _to_csv(batch):
+    buffer = io.StringIO()
+    for row in batch:
+        buffer.write(",".join(map(_csv_field, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+def _run():
+    while True:
+        batch = _next_batch()
+        try:
+            _write_batch(batch)
+        finally:
+            for _ in batch:
+                _rows.task_done()
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_chat_history_index(apps, schema_editor):
+    # chat_history is created outside Django, so skip databases that don't have it
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('public.chat_history')")
+        if cursor.fetchone()[0] is None:
+            return
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS chat_history_user_created_idx "
+            "ON chat_history (user_name, created_at DESC, chat_id DESC)"
+        )
+
+
+def drop_chat_history_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS chat_history_user_created_idx")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    atomic = False
+
+    dependencies = [
+        ('blog', '0004_alter_generatorconfiguration_database_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_chat_history_index, drop_chat_history_index),
+    ]
@@ -0,0 +1,28 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders API responses with orjson.
+
+    orjson encodes dicts, lists, strings, numbers, dates and UUIDs in C; anything else
+    (Decimal, lazy translation strings, ...) falls back to DRF's own JSON encoder, which
+    renders Decimal as a float. An `indent` in the accepted media type (or renderer
+    context) pretty-prints the output, always with two spaces as that is all orjson offers.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    _fallback = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Non-string keys (ints, UUIDs, ...) are allowed, as they are with DRF's JSONRenderer
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self._fallback, option=option)
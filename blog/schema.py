@@ -1,11 +1,11 @@
 from django.views import View
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from Query_executor.postges_exe import is_select_query
 
 
 class QueryExecutor():
     def __init__(self, connection):
-        super().__init__(connection)
         self.connection = connection
         
     def execute_query(self, query):
@@ -15,7 +15,7 @@ class QueryExecutor():
         try:
             with self.connection.cursor() as cursor:
                 cursor.execute(query)
-                if query.strip().lower().startswith("select"):
+                if is_select_query(query):
                     return cursor.fetchall()
                 return {"status": "success", "rows_affected": cursor.rowcount}
         except Exception as e:
@@ -1,6 +1,20 @@
-from django.test import TestCase
+import json
+import math
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, SimpleTestCase
+from django.utils import timezone as django_timezone
 from django.urls import reverse
 from rest_framework import status
+from Query_executor.mongo_exe import fix_json_keys, parse_json_argument, parse_query
+from Query_executor.postges_exe import is_select_query
+from blog import chat_history_writer
+from blog.renderers import ORJSONRenderer
+from blog.views import decode_history_cursor, encode_history_cursor
 
 class APITests(TestCase):
     def test_chat_response_handler_missing_query_string(self):
@@ -21,3 +35,127 @@ class APITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('raw_body', response.data)
         self.assertIn('parsed_data', response.data)
+
+
+class FixJsonKeysTests(SimpleTestCase):
+    def test_quotes_field_names_and_operators(self):
+        fixed = fix_json_keys("{age: {$gt: 30}, status: 'active'}")
+        self.assertEqual(json.loads(fixed), {"age": {"$gt": 30}, "status": "active"})
+
+    def test_keeps_apostrophes_inside_strings(self):
+        fixed = fix_json_keys("""{name: "O'Brien", nick: 'Bob \\'B\\''}""")
+        self.assertEqual(json.loads(fixed), {"name": "O'Brien", "nick": "Bob 'B'"})
+
+    def test_quotes_concat_field_references(self):
+        fixed = fix_json_keys("[{$project: {full: {$concat: [$first, ' ', $last]}}}]")
+        self.assertEqual(json.loads(fixed), [{"$project": {"full": {"$concat": ["$first", " ", "$last"]}}}])
+
+    def test_leaves_numbers_and_keywords_alone(self):
+        fixed = fix_json_keys("{a: 1e5, b: -2.5, c: true, d: null}")
+        self.assertEqual(json.loads(fixed), {"a": 1e5, "b": -2.5, "c": True, "d": None})
+
+    def test_normalizes_python_and_js_literals(self):
+        fixed = fix_json_keys("{a: True, b: False, c: None, d: undefined}")
+        self.assertEqual(json.loads(fixed), {"a": True, "b": False, "c": None, "d": None})
+
+    def test_parses_nan_and_infinity_as_floats(self):
+        parsed = parse_json_argument("{a: NaN, b: Infinity, c: -Infinity}")
+        self.assertTrue(math.isnan(parsed["a"]))
+        self.assertEqual((parsed["b"], parsed["c"]), (math.inf, -math.inf))
+
+    def test_rewrites_size_comparison_as_expr(self):
+        fixed = fix_json_keys("{tags: {$size: {$gt: 2}}}")
+        self.assertEqual(json.loads(fixed), {"tags": {"$expr": {"$gt": [{"$size": "2"}, 1]}}})
+
+
+class ParseQueryTests(SimpleTestCase):
+    def test_find_filter_with_commas_keeps_projection_separate(self):
+        parsed = parse_query("db.users.find({age: {$gt: 30}, city: 'Paris, FR'}, {name: 1, _id: 0})")
+        self.assertEqual(parsed, ("users", "find", {"age": {"$gt": 30}, "city": "Paris, FR"}, {"name": 1, "_id": 0}))
+
+
+class IsSelectQueryTests(SimpleTestCase):
+    def test_matches_first_keyword_case_insensitively(self):
+        self.assertTrue(is_select_query("\n  SeLeCt * FROM users"))
+        self.assertFalse(is_select_query("UPDATE users SET name = 'select'"))
+
+
+class HistoryCursorTests(SimpleTestCase):
+    def test_round_trips_created_at_and_chat_id(self):
+        created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        cursor = encode_history_cursor(created_at, "3f2c|id")
+        self.assertEqual(decode_history_cursor(cursor), (created_at, "3f2c|id"))
+
+    def test_rejects_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_history_cursor("not-a-cursor")
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_renders_dates_natively_and_decimals_via_fallback(self):
+        rendered = ORJSONRenderer().render({"at": datetime(2024, 5, 1, tzinfo=timezone.utc), "price": Decimal("1.50")})
+        self.assertEqual(json.loads(rendered), {"at": "2024-05-01T00:00:00Z", "price": 1.5})
+
+    def test_indents_when_the_media_type_asks_for_it(self):
+        rendered = ORJSONRenderer().render({"a": 1}, accepted_media_type="application/json; indent=4")
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_renders_non_string_keys(self):
+        rendered = ORJSONRenderer().render({1: "one", None: "none"})
+        self.assertEqual(json.loads(rendered), {"1": "one", "null": "none"})
+
+
+@skipUnless(connection.vendor == 'postgresql', "COPY and execute_values need PostgreSQL")
+class ChatHistoryWriterTests(TestCase):
+    # Text that the CSV (COPY) and VALUES paths escape differently; None must stay NULL
+    TRICKY_VALUES = ['say "hi", \'you\'', "line one\nline two", "back\\slash", "\\N", "", None]
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE chat_history (chat_id text, user_name text, user_query text, "
+                "generated_query text, database_type text, created_at timestamptz)"
+            )
+
+    def build_rows(self, count):
+        now = django_timezone.now()
+        return [
+            (f"{index:04d}", "alice", "q", self.TRICKY_VALUES[index % len(self.TRICKY_VALUES)], "sql", now)
+            for index in range(count)
+        ]
+
+    def read_back(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT chat_id, user_name, user_query, generated_query, database_type, created_at FROM chat_history ORDER BY chat_id")
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def test_execute_values_path_round_trips_values(self):
+        rows = self.build_rows(len(self.TRICKY_VALUES))
+        chat_history_writer._insert_rows(rows)
+        self.assertEqual(self.read_back(), rows)
+
+    def test_copy_path_round_trips_values(self):
+        rows = self.build_rows(chat_history_writer.COPY_THRESHOLD + 1)
+        chat_history_writer._insert_rows(rows)
+        self.assertEqual(self.read_back(), rows)
+
+
+@skipUnless(connection.vendor == 'postgresql', "chat_history queries use PostgreSQL row comparisons")
+class ChatHistoryViewTests(TestCase):
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE chat_history (chat_id text, user_name text, user_query text, "
+                "generated_query text, database_type text, created_at timestamptz)"
+            )
+            cursor.execute(
+                "INSERT INTO chat_history VALUES ('c1', 'alice', 'q', 'SELECT 1', 'sql', %s)",
+                [datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)],
+            )
+
+    def test_offset_page_keeps_isoformat_dates_and_total_count(self):
+        response = self.client.get(reverse('chat_history', args=['alice']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = json.loads(response.content)
+        self.assertEqual(body["chat_history"][0]["created_at"], "2024-05-01T12:30:00+00:00")
+        self.assertEqual(body["total_count"], 1)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     #path('sql/', views.ChatResponseHandler.as_view(), name='sql_generator'),  # Existing endpoint
     path('generate-query/', views.GenerateQueryView.as_view(), name='generate_query'),  # New endpoint for generating queries
+    path('generate-query/jobs/<str:job_id>/', views.GenerateQueryJobView.as_view(), name='generate_query_job'),
     path('execute-query/', views.ExecuteQueryView.as_view(), name='execute_query'),  # New endpoint for executing queries
     path('chat-history/<str:user_name>/', views.ChatHistoryView.as_view(), name='chat_history'),
 ]
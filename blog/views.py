@@ -1,346 +1,117 @@
-# from rest_framework.views import APIView
-# from rest_framework.response import Response
-# from rest_framework import status
-# from django.db import connections,connection
-# from Query_executor.postges_exe import QueryExecutor
-# from Query_generator import PostgresQueryGenerator, MongoQueryGenerator
-# from Connection_db.mongo_con import MongoDBConnection
-# import logging
-# from uuid import uuid4
-# from Query_executor import MongoQueryExecutor
-# from django.conf import settings
-# from pymongo import MongoClient
-# from rest_framework.permissions import AllowAny
-# from rest_framework.pagination import LimitOffsetPagination
-
-# logger = logging.getLogger(__name__)
-
-# class GenerateQueryView(APIView):
-#     permission_classes = [AllowAny]
-
-#     def post(self, request):
-#         try:
-#             logger.debug(f"Parsed request data: {request.data}")
-#             user_name = request.data.get('user_name')
-#             user_input = request.data.get('user_input')
-#             db_selected = request.data.get('db_selected', 'sql').lower()
-
-#             if not user_input or not isinstance(user_input, str) or not user_input.strip():
-#                 logger.error("Missing 'user_input' parameter.")
-#                 return Response(
-#                     {"error": "Missing 'user_input' parameter."},
-#                     status=status.HTTP_400_BAD_REQUEST
-#                 )
-
-#             if db_selected == "sql":
-#                 logger.debug("Generating SQL query.")
-#                 connection = connections['default']
-#                 generator = PostgresQueryGenerator(connection)
-#                 sql_query = generator.generate_query(user_input)
-#                 logger.debug(f"Generated SQL query: {sql_query}")
-#                 self.save_chat_history(user_name, user_input, sql_query, db_selected)
-#                 return Response(data={"generated_query": sql_query}, status=status.HTTP_200_OK)
-            
-#             else:
-#                 logger.debug("Generating NoSQL query.")
-#                 mongo_host = settings.MONGODB_SETTINGS["HOST"]
-#                 database_name = settings.MONGODB_SETTINGS["DATABASE_NAME"]
-#                 mongo_client = MongoClient(mongo_host)
-#                 generator = MongoQueryGenerator(mongo_client, database_name)
-#                 logger.debug(f"User input received: {user_input}")  # ✅ Debugging log
-#                 no_sql_query = generator.generate_query(user_input)
-#                 logger.debug(f"Generated NoSQL query: {no_sql_query}")
-#                 self.save_chat_history(user_name, user_input, no_sql_query, db_selected)
-#                 return Response(data={"generated_query": no_sql_query}, status=status.HTTP_200_OK)
-
-#         except Exception as e:
-#             logger.error(f"An error occurred while generating query: {str(e)}", exc_info=True)
-#             return Response(
-#                 {"error": f"An error occurred: {str(e)}"},
-#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-#             )
-#     def save_chat_history(self, user_id, user_query, generated_query, database_type):
-#         chat_id = str(uuid4())
-#         query = """
-#             INSERT INTO chat_history (chat_id, user_id, user_query, generated_query, database_type)
-#             VALUES (%s, %s, %s, %s, %s)
-#         """
-#         if isinstance(generated_query, dict):
-#             query2 = generated_query.get('query')
-#         else:
-#             query2 = generated_query
-#         with connections['default'].cursor() as cursor:
-#             cursor.execute(query, (chat_id, user_id, user_query, query2, database_type))
-#             connection.commit()
-
-# class ExecuteQueryView(APIView):
-#     permission_classes = [AllowAny]
-
-#     def post(self, request):
-#         """Execute a SQL query and return the result."""
-#         try:
-#             logger.debug(f"Received request data: {request.data}")
-#             generated_query = request.data.get('generated_query')
-#             db_selected = request.data.get('db_selected', 'sql').lower()
-#             if not generated_query or (isinstance(generated_query, dict) and 'query' not in generated_query):
-#                 return Response(
-#                     {"error": "Missing 'generated_query' parameter."},
-#                     status=status.HTTP_400_BAD_REQUEST
-#                 )
-
-#             # 🔹 Ensure generated_query is a string (adjust this based on actual format)
-#             if isinstance(generated_query, dict):
-#                 query = generated_query.get('query')
-#             else:
-#                 query = generated_query
-
-#             if not query:
-#                 return Response(
-#                     {"error": "Invalid 'generated_query' format. Expected a string or dict with 'query' key."},
-#                     status=status.HTTP_400_BAD_REQUEST
-#                 )
-
-#             if db_selected == "sql":
-#                 logger.debug("Executing SQL query.")
-#                 # Ensure database connection is open
-#                 connection = connections['default']
-#                 connection.ensure_connection()  #Reconnect if needed
-
-#                 if not connection.connection:
-#                     return Response(
-#                         {"error": "Database connection is not available."},
-#                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
-#                     )
-
-#                 # Execute query
-#                 executor = QueryExecutor(connection)
-#                 execution_result = executor.execute_query(query)  
-#                 logger.debug(f"Query executed successfully: {execution_result}")
-
-#                 return Response(
-#                     data={"execution_result": execution_result},
-#                     status=status.HTTP_200_OK
-#                 )
-
-#             else:
-#                 logger.debug("Executing NoSQL (MongoDB) query.")
-
-#                 # Connect to MongoDB
-#                 mongo_connection = MongoDBConnection()
-#                 mongo_connection.connect()
-#                 database_name = settings.MONGODB_SETTINGS["DATABASE_NAME"]
-
-#                 # Execute MongoDB query
-#                 executor = MongoQueryExecutor(mongo_connection.db)
-#                 execution_result = executor.execute_query(query)
-#                 logger.debug(f"Query executed successfully: {execution_result}")
-
-#                 # Check if the query execution was successful
-#                 if "error" in execution_result:
-#                     return Response(
-#                         {"error": execution_result["error"]},
-#                         status=status.HTTP_400_BAD_REQUEST
-#                     )
-#                 elif "data" in execution_result:
-#                     return Response(
-#                         data={"execution_result": execution_result["data"]},  # Return query result
-#                         status=status.HTTP_200_OK
-#                     )
-#         except Exception as e:
-#             logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-#             return Response(
-#                 {"error": f"An error occurred: {str(e)}"},
-#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-#             )
-            
-
-# class ChatSessionView(APIView):
-#     permission_classes = [AllowAny]
-#     pagination_class = LimitOffsetPagination
-
-#     def get(self, request):
-#         """Get paginated chat history"""
-#         try:
-#             user = request.user.username
-#             paginator = self.pagination_class()
-            
-#             # Get total count
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     "SELECT COUNT(*) FROM chat_history WHERE user_name = %s",
-#                     [user]
-#                 )
-#                 total_count = cursor.fetchone()[0]
-
-#             # Get paginated results
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     """
-#                     SELECT id, name, messages, database_type, created_at, last_updated
-#                     FROM chat_history
-#                     WHERE user_name = %s
-#                     ORDER BY last_updated DESC
-#                     LIMIT %s OFFSET %s
-#                     """,
-#                     [user, paginator.get_limit(request), paginator.get_offset(request)]
-#                 )
-#                 columns = [col[0] for col in cursor.description]
-#                 chats = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-#             return Response({
-#                 "results": chats,
-#                 "count": total_count,
-#                 "next": paginator.get_next_link(),
-#                 "previous": paginator.get_previous_link()
-#             })
-
-#         except Exception as e:
-#             logger.error(f"Chat history error: {str(e)}", exc_info=True)
-#             return Response({"error": "Failed to load history"}, status=500)
-
-#     def post(self, request):
-#         """Create new chat session"""
-#         try:
-#             user = request.user.username
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     """
-#                     INSERT INTO chat_history 
-#                     (user_name, name, messages, database_type)
-#                     VALUES (%s, %s, %s, %s)
-#                     RETURNING id, created_at
-#                     """,
-#                     [user, request.data.get('name'), [], 'sql']
-#                 )
-#                 chat = cursor.fetchone()
-                
-#             return Response({
-#                 "id": chat[0],
-#                 "created_at": chat[1].isoformat()
-#             }, status=201)
-
-#         except Exception as e:
-#             logger.error(f"Chat creation error: {str(e)}")
-#             return Response({"error": "Chat creation failed"}, status=500)
-
-# class ChatDetailView(APIView):
-#     permission_classes = [AllowAny]
-
-#     def put(self, request, pk):
-#         """Update chat session"""
-#         try:
-#             user = request.user.username
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     """
-#                     UPDATE chat_history 
-#                     SET 
-#                         messages = %s,
-#                         database_type = %s,
-#                         last_updated = NOW()
-#                     WHERE 
-#                         id = %s 
-#                         AND user_name = %s
-#                     RETURNING last_updated
-#                     """,
-#                     [
-#                         request.data.get('messages'),
-#                         request.data.get('database_type'),
-#                         pk,
-#                         user
-#                     ]
-#                 )
-                
-#                 if cursor.rowcount == 0:
-#                     return Response({"error": "Not found"}, status=404)
-                    
-#                 last_updated = cursor.fetchone()[0]
-                
-#             return Response({"last_updated": last_updated.isoformat()})
-
-#         except Exception as e:
-#             logger.error(f"Chat update error: {str(e)}")
-#             return Response({"error": "Update failed"}, status=500)
-
-#     def delete(self, request, pk):
-#         """Delete specific chat"""
-#         try:
-#             user = request.user.username
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     "DELETE FROM chat_history WHERE id = %s AND user_name = %s",
-#                     [pk, user]
-#                 )
-#             return Response(status=204)
-#         except Exception as e:
-#             logger.error(f"Chat delete error: {str(e)}")
-#             return Response({"error": "Deletion failed"}, status=500)
-
-# class CurrentChatView(APIView):
-#     permission_classes = [AllowAny]
-
-#     def get(self, request):
-#         """Get most recent chat"""
-#         try:
-#             user = request.user.username
-#             with connections['default'].cursor() as cursor:
-#                 cursor.execute(
-#                     """
-#                     SELECT id, name, messages, database_type 
-#                     FROM chat_history 
-#                     WHERE user_name = %s 
-#                     ORDER BY last_updated DESC 
-#                     LIMIT 1
-#                     """,
-#                     [user]
-#                 )
-#                 chat = cursor.fetchone()
-                
-#             if not chat:
-#                 return Response({"error": "No chats found"}, status=404)
-
-#             return Response({
-#                 "id": chat[0],
-#                 "name": chat[1],
-#                 "messages": chat[2],
-#                 "database_type": chat[3]
-#             })
-
-#         except Exception as e:
-#             logger.error(f"Current chat error: {str(e)}")
-#             return Response({"error": "Failed to get current chat"}, status=500)
-
+import orjson
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connections, connection
-from Query_executor.postges_exe import QueryExecutor
+from django.db import close_old_connections, connections
+from Query_executor.postges_exe import QueryExecutor, is_select_query
 from Query_generator import PostgresQueryGenerator, MongoQueryGenerator
-from Connection_db.mongo_con import MongoDBConnection
+from Connection_db.mongo_con import get_mongo_client, get_mongo_db
 import logging
+import threading
+import time
+from hashlib import blake2b
 from uuid import uuid4
 from Query_executor import MongoQueryExecutor
+from blog.chat_history_writer import enqueue_chat_history
 from django.conf import settings
-from pymongo import MongoClient
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
 from rest_framework.permissions import AllowAny
-import json
-from datetime import datetime,date
-
-# Convert datetime objects for JSON serialization
-def convert_datetime(obj):
-    """Convert datetime and date objects to JSON serializable format."""
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError("Type not serializable") 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
 
 logger = logging.getLogger(__name__)
 
+# Read once at import rather than through LazySettings on every request
+_MONGO_DATABASE_NAME = getattr(settings, "MONGODB_SETTINGS", {}).get("DATABASE_NAME", "default_db")
+
+def extract_query(generated_query):
+    """Return the query text from a generator response, which is either {"query": ...} or the bare query."""
+    return generated_query.get('query') if isinstance(generated_query, dict) else generated_query
+
+# Generators read their prompt and schema on construction, so each one is reused for a while
+_GENERATOR_TTL = 300  # seconds
+_generators = {}
+_generators_lock = threading.Lock()
+
+_GENERATED_QUERY_TTL = 3600  # seconds
+_GENERATOR_FACTORIES = {
+    "sql": lambda: PostgresQueryGenerator(connections['default']),
+    "nosql": lambda: MongoQueryGenerator(get_mongo_client(), _MONGO_DATABASE_NAME),
+}
+
+def generator_kind(db_selected):
+    """Map db_selected to a _GENERATOR_FACTORIES key; anything but "sql" is served from MongoDB."""
+    return db_selected if db_selected in _GENERATOR_FACTORIES else "nosql"
+
+def get_query_generator(db_selected):
+    """
+    Return (generator, schema_fingerprint) for "sql" (Postgres) or anything else (MongoDB).
+
+    One instance per database type is shared for _GENERATOR_TTL seconds, so the prompt
+    lookup and schema introspection run a few times an hour instead of on every request.
+    The fingerprint changes whenever the prompt or schema the generator was built from does.
+    """
+    kind = generator_kind(db_selected)
+    now = time.monotonic()
+    with _generators_lock:
+        cached = _generators.get(kind)
+        if cached and now - cached[2] < _GENERATOR_TTL:
+            return cached[0], cached[1]
+
+    generator = _GENERATOR_FACTORIES[kind]()
+    fingerprint = blake2b(repr((generator.prompt, generator.table_schemas)).encode(), digest_size=16).hexdigest()
+
+    with _generators_lock:
+        _generators[kind] = (generator, fingerprint, now)
+    return generator, fingerprint
+
+def generate_query_cached(db_selected, user_input):
+    """
+    Generate a query for user_input, reusing the result of an identical request made
+    against the same prompt and schema within _GENERATED_QUERY_TTL seconds.
+    """
+    generator, fingerprint = get_query_generator(db_selected)
+    cleaned_input = generator.clean_user_query(user_input)
+    if not cleaned_input:
+        return generator.generate_query(user_input)  # raises the usual "Invalid user query"
+
+    input_hash = blake2b(cleaned_input.encode(), digest_size=16).hexdigest()
+    cache_key = f"generated_query:{generator_kind(db_selected)}:{fingerprint}:{input_hash}"
+    generated_query = cache.get(cache_key)
+    if generated_query is None:
+        generated_query = generator.generate_query(user_input)
+        if generated_query:  # an unparseable model response comes back as {}; don't keep it
+            cache.set(cache_key, generated_query, _GENERATED_QUERY_TTL)
+    return generated_query
+
+# Background generation for clients that opt in with "async": results are polled from the cache,
+# which must be shared (REDIS_URL) when several worker processes serve the API
+_GENERATE_JOB_TTL = 600  # seconds
+_MAX_PENDING_GENERATE_JOBS = 32  # queued plus running; further async requests get a 429
+_generate_job_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="generate-query")
+_generate_job_slots = threading.BoundedSemaphore(_MAX_PENDING_GENERATE_JOBS)
+
+def async_jobs_available():
+    """
+    Job state is polled from the cache, so async mode needs one every worker shares.
+    A per-process LocMemCache only qualifies under DEBUG, i.e. the single-process runserver.
+    """
+    return settings.DEBUG or not isinstance(caches['default'], LocMemCache)
+
+def generate_job_key(job_id):
+    return f"generate_job:{job_id}"
+
 class GenerateQueryView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
         try:
-            logger.debug(f"Parsed request data: {request.data}")
+            logger.debug("Parsed request data: %s", request.data)
             user_name = request.data.get('user_name')
             user_input = request.data.get('user_input')
             db_selected = request.data.get('db_selected', 'sql').lower()
@@ -349,55 +120,82 @@ class GenerateQueryView(APIView):
                 logger.error("Missing 'user_input' parameter.")
                 return Response({"error": "Missing 'user_input' parameter."}, status=status.HTTP_400_BAD_REQUEST)
 
-            if db_selected == "sql":
-                logger.debug("Generating SQL query.")
-                connection = connections['default']
-                generator = PostgresQueryGenerator(connection)
-                sql_query = generator.generate_query(user_input)
-                logger.debug(f"Generated SQL query: {sql_query}")
-                self.save_chat_history(user_name, user_input, sql_query, db_selected)
-                return Response(data={"generated_query": sql_query}, status=status.HTTP_200_OK)
-            
-            else:
-                logger.debug("Generating NoSQL query.")
-                mongo_host = settings.MONGODB_SETTINGS["HOST"]
-                database_name = settings.MONGODB_SETTINGS["DATABASE_NAME"]
-                mongo_client = MongoClient(mongo_host)
-                generator = MongoQueryGenerator(mongo_client, database_name)
-                no_sql_query = generator.generate_query(user_input)
-                self.save_chat_history(user_name, user_input, no_sql_query, db_selected)
-                return Response(data={"generated_query": no_sql_query}, status=status.HTTP_200_OK)
+            # Opt-in: answer 202 straight away instead of holding the worker through the LLM call
+            if request.data.get('async'):
+                if not async_jobs_available():
+                    return Response({"error": "Async generation is not available on this server."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                if not _generate_job_slots.acquire(blocking=False):
+                    return Response({"error": "Too many pending generation jobs; try again later."}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+                job_id = str(uuid4())
+                try:
+                    cache.set(generate_job_key(job_id), {"status": "pending"}, _GENERATE_JOB_TTL)
+                    _generate_job_pool.submit(self.run_generate_job, job_id, user_name, user_input, db_selected)
+                except Exception:
+                    _generate_job_slots.release()
+                    raise
+                return Response(
+                    data={"job_id": job_id, "status": "pending", "status_url": reverse('generate_query_job', args=[job_id])},
+                    status=status.HTTP_202_ACCEPTED,
+                )
+
+            # The generator is picked by database type inside get_query_generator
+            generated_query = generate_query_cached(db_selected, user_input)
+            logger.debug("Generated %s query: %s", db_selected, generated_query)
+            self.save_chat_history(user_name, user_input, generated_query, db_selected)
+            return Response(data={"generated_query": generated_query}, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"An error occurred while generating query: {str(e)}", exc_info=True)
+            logger.error("An error occurred while generating query: %s", e, exc_info=True)
             return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def run_generate_job(self, job_id, user_name, user_input, db_selected):
+        """Generate a query on _generate_job_pool and store the outcome for GenerateQueryJobView."""
+        close_old_connections()
+        try:
+            generated_query = generate_query_cached(db_selected, user_input)
+            self.save_chat_history(user_name, user_input, generated_query, db_selected)
+            job = {"status": "done", "generated_query": generated_query}
+        except Exception as e:
+            logger.error("An error occurred while generating query: %s", e, exc_info=True)
+            job = {"status": "failed", "error": f"An error occurred: {str(e)}"}
+        finally:
+            close_old_connections()
+        try:
+            cache.set(generate_job_key(job_id), job, _GENERATE_JOB_TTL)
+        finally:
+            _generate_job_slots.release()
+
     def save_chat_history(self, user_name, user_query, generated_query, database_type):
         chat_id = str(uuid4())
-        query = """
-            INSERT INTO chat_history (chat_id, user_name, user_query, generated_query, database_type, created_at)
-            VALUES (%s, %s, %s, %s, %s, NOW())
-        """
-        query2 = generated_query.get('query') if isinstance(generated_query, dict) else generated_query
+        query2 = extract_query(generated_query)
+
+        # Written in batches by a background thread so the response doesn't wait on the INSERT
+        enqueue_chat_history(chat_id, user_name, user_query, query2, database_type)
+
+class GenerateQueryJobView(APIView):
+    permission_classes = [AllowAny]
 
-        with connections['default'].cursor() as cursor:
-            cursor.execute(query, (chat_id, user_name, user_query, query2, database_type))
-            connection.commit()
+    def get(self, request, job_id):
+        job = cache.get(generate_job_key(job_id))
+        if job is None:
+            return Response({"error": "Unknown or expired job."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data=job, status=status.HTTP_200_OK)
 
 class ExecuteQueryView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
         try:
-            logger.debug(f"Received request data: {request.data}") 
+            logger.debug("Received request data: %s", request.data)
             generated_query = request.data.get('generated_query')
             db_selected = request.data.get('db_selected', 'sql').lower()
             if not generated_query or (isinstance(generated_query, dict) and 'query' not in generated_query):
                 return Response({"error": "Missing 'generated_query' parameter."}, status=status.HTTP_400_BAD_REQUEST)
 
-            query = generated_query.get('query') if isinstance(generated_query, dict) else generated_query
+            query = extract_query(generated_query)
 
-            if not query:
+            # Reject anything that isn't query text before a database connection is touched
+            if not isinstance(query, str) or not query.strip():
                 return Response({"error": "Invalid 'generated_query' format."}, status=status.HTTP_400_BAD_REQUEST)
 
             if db_selected == "sql":
@@ -409,19 +207,26 @@ class ExecuteQueryView(APIView):
                     return Response({"error": "Database connection is not available."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
                 executor = QueryExecutor(connection)
+
+                # Opt-in NDJSON streaming: rows go out as the server-side cursor yields them.
+                # The first row is fetched here so a failing query still gets the error
+                # response instead of a 200 that is cut short once streaming has begun.
+                if request.data.get('stream') and is_select_query(query):
+                    rows = executor.iter_rows(query)
+                    first_row = next(rows, None)
+                    head = () if first_row is None else (first_row,)
+                    lines = (orjson.dumps(row) + b"\n" for row in chain(head, rows))
+                    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+                # Rows come back with dates and Decimals already normalized for JSON
                 execution_result = executor.execute_query(query)
-                execution_result_serialized = json.loads(json.dumps(execution_result, default=convert_datetime))
 
-                return Response(data={"execution_result": execution_result_serialized}, status=status.HTTP_200_OK)
+                return Response(data={"execution_result": execution_result}, status=status.HTTP_200_OK)
 
             else:
                 logger.debug("Executing NoSQL (MongoDB) query.")
 
-                mongo_connection = MongoDBConnection()
-                mongo_connection.connect()
-                database_name = settings.MONGODB_SETTINGS["DATABASE_NAME"]
-
-                executor = MongoQueryExecutor(mongo_connection.db)
+                executor = MongoQueryExecutor(get_mongo_db())
                 execution_result = executor.execute_query(query)
 
                 if "error" in execution_result:
@@ -430,40 +235,100 @@ class ExecuteQueryView(APIView):
                     return Response(data={"execution_result": execution_result["data"]}, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+            logger.error("Unexpected error: %s", e, exc_info=True)
             return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# Runs total counts alongside the page query; each worker thread holds its own Django connection
+def count_chat_history(user_name):
+    """Count a user's chat history rows; an index-only scan on chat_history_user_created_idx."""
+    with connections['default'].cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM chat_history WHERE user_name = %s", [user_name])
+        return cursor.fetchone()[0]
+
+def encode_history_cursor(created_at, chat_id):
+    """Encode the position of a chat history row as an opaque `after` cursor."""
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{chat_id}".encode()).decode()
+
+def decode_history_cursor(cursor):
+    """Decode an `after` cursor back into (created_at, chat_id); raises ValueError if malformed."""
+    created_at, chat_id = urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    return datetime.fromisoformat(created_at), chat_id
+
 class ChatHistoryView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, user_name):
+        """
+        Returns a page of the user's chat history, newest first.
+
+        Pages are keyed on (created_at, chat_id): pass the returned `next_cursor` as `after`
+        to fetch the next page, which costs the same however deep it is. `offset` is still
+        accepted for older clients and always returns `total_count` as before; keyset pages
+        add it only when asked with `include_total=1`.
+        """
         try:
             limit = max(1, min(int(request.query_params.get('limit', 10)), 100))
-            offset = max(0, int(request.query_params.get('offset', 0)))
-
-            count_query = "SELECT COUNT(*) FROM chat_history WHERE user_name = %s"
-            with connections['default'].cursor() as cursor:
-                cursor.execute(count_query, [user_name])
-                total_count = cursor.fetchone()[0]
-
-            query = """
-                SELECT chat_id, user_query, generated_query, database_type, created_at
-                FROM chat_history
-                WHERE user_name = %s
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """
+            after = request.query_params.get('after')
+            # Offset responses have always carried total_count; keyset pages opt in
+            include_total = request.query_params.get('include_total') == '1' if after else True
+
+            if after:
+                try:
+                    after_created_at, after_chat_id = decode_history_cursor(after)
+                except ValueError:
+                    return Response({"error": "Invalid 'after' cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+                query = """
+                    SELECT chat_id, user_query, generated_query, database_type, created_at
+                    FROM chat_history
+                    WHERE user_name = %s AND (created_at, chat_id) < (%s, %s)
+                    ORDER BY created_at DESC, chat_id DESC
+                    LIMIT %s
+                """
+                params = (user_name, after_created_at, after_chat_id, limit + 1)
+            else:
+                offset = max(0, int(request.query_params.get('offset', 0)))
+                # Offset pages see the user's whole history, so the total rides along in the same query
+                total_column = ", COUNT(*) OVER ()" if include_total else ""
+                query = f"""
+                    SELECT chat_id, user_query, generated_query, database_type, created_at{total_column}
+                    FROM chat_history
+                    WHERE user_name = %s
+                    ORDER BY created_at DESC, chat_id DESC
+                    LIMIT %s OFFSET %s
+                """
+                params = (user_name, limit + 1, offset)
+
+            # One extra row tells us whether another page exists without counting
             with connections['default'].cursor() as cursor:
-                cursor.execute(query, (user_name, limit, offset))
+                cursor.execute(query, params)
                 chat_history = cursor.fetchall()
 
+            has_more = len(chat_history) > limit
+            chat_history = chat_history[:limit]
+
             formatted_history = [
-                {"chat_id": chat[0], "user_query": chat[1], "generated_query": chat[2], "database_type": chat[3], "created_at": convert_datetime(chat[4])}
+                # created_at keeps the isoformat ("+00:00") string the API has always returned
+                {"chat_id": chat[0], "user_query": chat[1], "generated_query": chat[2], "database_type": chat[3], "created_at": chat[4] and chat[4].isoformat()}
                 for chat in chat_history
             ]
-
-            return Response(data={"chat_history": formatted_history, "total_count": total_count}, status=status.HTTP_200_OK)
+            data = {
+                "chat_history": formatted_history,
+                "has_more": has_more,
+                "next_cursor": encode_history_cursor(chat_history[-1][4], chat_history[-1][0]) if has_more else None,
+            }
+
+            if include_total:
+                if after:
+                    data["total_count"] = count_chat_history(user_name)
+                elif chat_history:
+                    data["total_count"] = chat_history[0][5]
+                else:
+                    # An empty page past the end carries no total; only then count separately
+                    data["total_count"] = count_chat_history(user_name) if offset else 0
+
+            return Response(data=data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"Error fetching chat history: {str(e)}", exc_info=True)
-            return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            logger.error("Error fetching chat history: %s", e, exc_info=True)
+            return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,54 @@
+import threading
+import time
+from hashlib import blake2b
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CACHE_TIMEOUT = 60  # seconds a token's user is served without hitting the database
+MAX_CACHED_TOKENS = 10000
+
+# Verified tokens by digest of the raw token; entries are trusted only until their exp claim
+_validated_tokens = {}
+_validated_tokens_lock = threading.Lock()
+
+
+def user_cache_key(user_id):
+    return f"jwt_user:{user_id}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the token's user in the cache for USER_CACHE_TIMEOUT.
+
+    The stock class loads the user with a SELECT on every request, so polling endpoints
+    like ProfileView hit the database each time. Saving or deleting a user drops its
+    entry (see users.signals), but only in the cache of the process that made the change:
+    with the default per-process LocMemCache, other workers may keep serving the old role
+    or active flag for up to USER_CACHE_TIMEOUT seconds. Configure a shared cache (e.g.
+    Redis) to make the invalidation apply everywhere.
+    Tokens whose signature already checked out are also remembered until they expire,
+    so a client repeating the same token skips the decode and signature verification.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = blake2b(raw_token, digest_size=16).digest()
+        token = _validated_tokens.get(key)
+        if token is not None and token.get('exp', 0) > time.time():
+            return token
+        token = super().get_validated_token(raw_token)
+        with _validated_tokens_lock:
+            _validated_tokens.pop(key, None)
+            if len(_validated_tokens) >= MAX_CACHED_TOKENS:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                del _validated_tokens[next(iter(_validated_tokens))]
+            _validated_tokens[key] = token
+        return token
+
+    def get_user(self, validated_token):
+        key = user_cache_key(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,37 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # Registration used to allow emails that differ only in case; stop with a clear list
+    # instead of a bare IntegrityError so they can be merged or edited by hand first
+    CustomUser = apps.get_model('users', 'CustomUser')
+    duplicates = list(
+        CustomUser.objects.exclude(email='')
+        .values(lowered=Lower('email'))
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('lowered', flat=True)
+    )
+    if duplicates:
+        raise ValueError(
+            "Cannot add the case-insensitive email constraint; these emails are used by "
+            f"more than one user: {', '.join(sorted(duplicates))}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='users_customuser_email_ci_unique'),
+        ),
+    ]
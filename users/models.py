@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
 
 from django.contrib.auth.models import AbstractUser
@@ -10,6 +11,12 @@ class CustomUser(AbstractUser):
     )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails are unique regardless of case; blank emails stay allowed
+            models.UniqueConstraint(Lower('email'), condition=~models.Q(email=''), name='users_customuser_email_ci_unique'),
+        ]
+
 class Profile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     image = models.ImageField(default='default.jpg', upload_to='profile_pics')
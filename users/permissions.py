@@ -1,8 +1,20 @@
 from rest_framework import permissions
 
-class HasRole(permissions.BasePermission):
-    def __init__(self, roles):
-        self.roles = roles
+def HasRole(roles):
+    """
+    Build a permission class that admits authenticated users with one of the given roles.
 
-    def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role in self.roles
\ No newline at end of file
+    DRF instantiates each entry of permission_classes itself, so this returns a class
+    rather than an instance, with the roles frozen into a set once at class creation.
+    The role comes from request.user, which CachedJWTAuthentication serves from the cache,
+    so a role change is not outlived by the token's role claim.
+    """
+    allowed = frozenset(roles)
+
+    class _HasRole(permissions.BasePermission):
+        roles = allowed
+
+        def has_permission(self, request, view):
+            return request.user.is_authenticated and request.user.role in self.roles
+
+    return _HasRole
@@ -1,4 +1,9 @@
+import re
+from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .models import CustomUser
+
+_USERNAME_RE = re.compile(r'^[A-Za-z0-9_.-]{3,32}\Z')  # RegexField uses search(), so anchor both ends
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -7,4 +12,22 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['role'] = user.role  # Add role to the token payload
         token['username'] = user.username  # Optionally add username
         token['email'] = user.email  # Optionally add email
-        return token
\ No newline at end of file
+        return token
+
+class RegisterSerializer(serializers.Serializer):
+    username = serializers.RegexField(
+        _USERNAME_RE, max_length=32,
+        error_messages={'invalid': "Username must be 3-32 letters, digits, '.', '_' or '-'."},
+    )
+    email = serializers.EmailField(max_length=254)
+    password = serializers.CharField(max_length=128, trim_whitespace=False)
+    role = serializers.ChoiceField(choices=CustomUser.ROLE_CHOICES, default='user')
+
+class LoginSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150)
+    password = serializers.CharField(max_length=128, trim_whitespace=False)
+
+def first_error(errors):
+    """Flatten serializer errors to the single 'field: message' string the API returns."""
+    field, messages = next(iter(errors.items()))
+    return f"{field}: {messages[0]}"
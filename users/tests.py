@@ -1,3 +1,53 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
 
-# Create your tests here.
+from users.models import CustomUser
+from users.serializers import CustomTokenObtainPairSerializer, RegisterSerializer
+
+
+class RegisterSerializerTests(SimpleTestCase):
+    def test_rejects_username_with_spaces_or_markup(self):
+        for username in ('bad user<script>', 'x;DROP TABLE--abc'):
+            serializer = RegisterSerializer(data={'username': username, 'email': 'a@example.com', 'password': 'secret123'})
+            self.assertFalse(serializer.is_valid())
+            self.assertIn('username', serializer.errors)
+
+    def test_accepts_plain_username(self):
+        serializer = RegisterSerializer(data={'username': 'jane.doe_1', 'email': 'a@example.com', 'password': 'secret123'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class AdminViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get_admin(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return self.client.get(reverse('admin'), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_admin_is_welcomed(self):
+        admin = CustomUser.objects.create_user(username='boss', email='boss@example.com', password='secret123', role='admin')
+        response = self.get_admin(admin)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'message': 'Welcome, Admin!'})
+
+    def test_non_admin_is_forbidden(self):
+        user = CustomUser.objects.create_user(username='jane', email='jane@example.com', password='secret123')
+        self.assertEqual(self.get_admin(user).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_role_change_applies_to_the_same_token_immediately(self):
+        user = CustomUser.objects.create_user(username='jane', email='jane@example.com', password='secret123')
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        url, auth = reverse('admin'), f"Bearer {token}"
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=auth).status_code, status.HTTP_403_FORBIDDEN)
+
+        # The cached user is dropped by the post_save signal, so the stale token's role claim doesn't matter
+        user.role = 'admin'
+        user.save()
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=auth).status_code, status.HTTP_200_OK)
+
+        user.role = 'user'
+        user.save()
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=auth).status_code, status.HTTP_403_FORBIDDEN)
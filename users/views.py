@@ -1,37 +1,44 @@
+import orjson
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import CustomUser
-from .serializers import CustomTokenObtainPairSerializer
+from .serializers import CustomTokenObtainPairSerializer, LoginSerializer, RegisterSerializer, first_error
 from .permissions import HasRole
 
+_ADMIN_BODY = orjson.dumps({'message': 'Welcome, Admin!'})
+
 # Register View
 class RegisterView(APIView):
     def post(self, request):
-        username = request.data.get('username')
-        email = request.data.get('email')
-        password = request.data.get('password')
-        role = request.data.get('role', 'user')  # Default role is 'user'
+        # Reject malformed payloads before they reach the database; role defaults to 'user'
+        serializer = RegisterSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'error': first_error(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
 
-        if CustomUser.objects.filter(username=username).exists():
-            return Response({'error': 'Username already exists.'}, status=status.HTTP_400_BAD_REQUEST)
-        if CustomUser.objects.filter(email=email).exists():
+        # Let the unique constraints catch duplicates; only a conflict costs a second query
+        try:
+            with transaction.atomic():
+                CustomUser.objects.create_user(**data)
+        except IntegrityError:
+            if CustomUser.objects.filter(username=data['username']).exists():
+                return Response({'error': 'Username already exists.'}, status=status.HTTP_400_BAD_REQUEST)
             return Response({'error': 'Email already exists.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        user = CustomUser.objects.create_user(username=username, email=email, password=password, role=role)
         return Response({'message': 'User registered successfully!'}, status=status.HTTP_201_CREATED)
 
 # Login View
 class LoginView(APIView):
     def post(self, request):
-        username = request.data.get('username')
-        password = request.data.get('password')
-        user = authenticate(username=username, password=password)
+        serializer = LoginSerializer(data=request.data)
+        user = authenticate(**serializer.validated_data) if serializer.is_valid() else None
 
         if user is not None:
-            refresh = RefreshToken.for_user(user)
+            # Same claims as the token endpoint, so the role travels in the token
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             return Response({
                 'message': 'Login successful!',
                 'access_token': str(refresh.access_token),
@@ -61,4 +68,5 @@ class AdminView(APIView):
     permission_classes = [IsAuthenticated, HasRole(['admin'])]
 
     def get(self, request):
-        return Response({'message': 'Welcome, Admin!'}, status=status.HTTP_200_OK)
\ No newline at end of file
+        # The body never changes, so it is rendered once at import instead of per request
+        return HttpResponse(_ADMIN_BODY, content_type='application/json')
\ No newline at end of file